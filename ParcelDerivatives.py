@@ -17,11 +17,24 @@
  """
 
 import arcpy
+import functools
+import logging
+import logging.handlers
+import multiprocessing
 import os
+import re
+import time
 import traceback
+import types
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 sys.path.insert(0, "C:/Scripts")
-import Logging
+
+# Spawned workers re-import this script, and the shared Logging setup opens the log with mode "w", so only the main process imports it.
+# Workers bind a stand-in in the worker section below instead
+if __name__ != "__mp_main__":
+    import Logging
 
 # Environment
 arcpy.env.overwriteOutput = True
@@ -51,14 +64,20 @@ census_tracts = os.path.join(demography, "Tract2010Insp")
 qualified_census_tracts = os.path.join(demography, "CenTract_Qualified")
 parcel_polygons = os.path.join(cadastral, "soa.SANGIS.Parcel_Poly")
 
-# Parcel derivatives paths
+# Staging workspace for intermediates that are made and used within the same stage
+staging = "memory"
+
+# Parcel derivatives paths, the owner tables from the single owner pass stay on disk so every worker can read them
 parcel_derivatives = os.path.join(data, "ParcelDerivatives.gdb")
-parcels = os.path.join(parcel_derivatives, "ParcelPolygons")
+parcels_cache = os.path.join(parcel_derivatives, "ParcelPolygons_Cache")
 parcels_nehemiah_table = os.path.join(parcel_derivatives, "Parcels_Nehemiah_table")
 parcels_tsp_table = os.path.join(parcel_derivatives, "Parcels_TSP_table")
 parcels_city_table = os.path.join(parcel_derivatives, "Parcels_City_table")
 parcels_commercial_table = os.path.join(parcel_derivatives, "Parcels_Commercial_table")
-parcels_owner_city = os.path.join(parcel_derivatives, "Parcels_City")
+parcels_nehemiah = os.path.join(parcel_derivatives, "Parcels_Nehemiah")
+parcels_tsp = os.path.join(parcel_derivatives, "Parcels_TSP")
+parcels_commercial = os.path.join(parcel_derivatives, "Parcels_Commercial")
+parcels_owner_city = os.path.join(staging, "Parcels_City")
 parcels_cwlp = os.path.join(parcel_derivatives, "Parcels_CWLP")
 parcels_cospw = os.path.join(parcel_derivatives, "Parcels_COSPW")
 parcels_oped = os.path.join(parcel_derivatives, "Parcels_OPED")
@@ -66,12 +85,12 @@ parcels_trustee = os.path.join(parcel_derivatives, "Parcels_CountyTrustee")
 parcels_poi = os.path.join(parcel_derivatives, "Parcel_POI")
 points_surplus_property = os.path.join(parcel_derivatives, "Points_SurplusProperty")
 
-# Permits paths
+# Permits paths, the enrichment chain is staged in memory since each step only feeds the next spatial join
 permits_issued = os.path.join(parcel_derivatives, "Permits_Issued")
-permits_CTQ = os.path.join(parcel_derivatives, "Permits_CTQ")
-permits_EZ = os.path.join(parcel_derivatives, "Permits_EZ")
-permits_TIF = os.path.join(parcel_derivatives, "Permit_TIF")
-permits_Wards = os.path.join(parcel_derivatives, "Permits_Wards")
+permits_CTQ = os.path.join(staging, "Permits_CTQ")
+permits_EZ = os.path.join(staging, "Permits_EZ")
+permits_TIF = os.path.join(staging, "Permit_TIF")
+permits_Wards = os.path.join(staging, "Permits_Wards")
 permits_opportunity_zones = os.path.join(parcel_derivatives, "Permits_OpportunityZones")
 parcels_permits_issued = os.path.join(parcel_derivatives, "Parcels_PermitsIssued")
 parcels_surplus_property = os.path.join(parcel_derivatives, "Parcels_SurplusProperty")
@@ -80,6 +99,9 @@ parcels_surplus_property = os.path.join(parcel_derivatives, "Parcels_SurplusProp
 parcels_owner_medical_table = os.path.join(parcel_derivatives, "Parcels_Medical_table")
 parcels_owner_schools_table = os.path.join(parcel_derivatives, "Parcels_Schools_table")
 parcels_owner_state_table = os.path.join(parcel_derivatives, "Parcels_State_table")
+parcels_owner_medical = os.path.join(parcel_derivatives, "Parcels_Medical")
+parcels_owner_schools = os.path.join(parcel_derivatives, "Parcels_Schools")
+parcels_owner_state = os.path.join(parcel_derivatives, "Parcels_State")
 
 # Administrative area paths
 admin_area = os.path.join(cityworks_prod, "AdministrativeArea")
@@ -91,10 +113,259 @@ infrastructure_operations = os.path.join(cityworks_prod, "InfrastructureOperatio
 row = os.path.join(infrastructure_operations, "ROW")
 mow_zones = os.path.join(parcel_derivatives, "MowZones")
 
-# List of features to clean up
-to_delete = [parcels, permits_CTQ, permits_EZ, permits_TIF, permits_Wards,
-             parcels_nehemiah_table, parcels_tsp_table, parcels_city_table,
-             parcels_owner_city, parcels_owner_medical_table, parcels_owner_schools_table, parcels_owner_state_table, parcels_commercial_table]
+# Owner fields the category tests read, placed first in every owner row
+owner_fields = ["PIN1", "Owner1", "Owner2", "MTGCode", "ClassCode"]
+
+# City owner table fields as [name, type, alias, length], in the order the City field mapping has always written them
+city_owner_fields = [["tmppin", "DOUBLE", "tmppin", ""], ["Owner1", "TEXT", "Owner1", 30], ["MTGCode", "SHORT", "MTGCode", ""], ["PIN1", "TEXT", "PIN1", 11]]
+
+# Owner name patterns, case insensitive like the SDE LIKE filters they replace
+nehemiah_owner1 = re.compile(r"NEHEMIAH (AFFORDABLE HOUSING (II|LP)|EXPANSION|PSJ LP)", re.IGNORECASE)
+tsp_owner1 = re.compile(r"TSP", re.IGNORECASE)
+medical_owner1 = re.compile(r"MEMORIAL HEALTH SYSTEM|SIU SCHOOL OF MEDICIN|ST JOHNS|SPRINGFIELD CLINIC|Springfield Hospital|Central Counties Health", re.IGNORECASE)
+medical_owner2 = re.compile(r"MCFARLAND MENTAL HEALTH|Public Health Facility", re.IGNORECASE)
+schools_owner1 = re.compile(r"186|Sacred Heart|ST AGNES|Lincoln Land Community|U of IL At|Capital Area Career Center", re.IGNORECASE)
+schools_owner2 = re.compile(r"186|Sacred Heart|ST AGNES|Christ the King", re.IGNORECASE)
+state_owner2 = re.compile(r"SECRETARY", re.IGNORECASE)
+
+# Coarse SDE filter covering every owner category so only candidate owner rows leave the database, the patterns above decide the rest
+owner_where = ("Owner1 LIKE '%NEHEMIAH%' Or Owner1 LIKE '%TSP%' Or MTGCode IN (26, 66, 72, 73) Or Owner1 LIKE '%SANGAMON COUNTY TRUSTEE%' Or "
+               "Owner1 LIKE '%MEMORIAL HEALTH SYSTEM%' Or Owner1 LIKE '%SIU SCHOOL OF MEDICIN%' Or Owner1 LIKE '%ST JOHNS%' Or "
+               "Owner1 LIKE '%SPRINGFIELD CLINIC%' Or Owner1 LIKE '%Springfield Hospital%' Or Owner1 LIKE '%Central Counties Health%' Or "
+               "Owner2 LIKE '%MCFARLAND MENTAL HEALTH%' Or Owner2 LIKE '%Public Health Facility%' Or "
+               "Owner1 LIKE '%186%' Or Owner1 LIKE '%Sacred Heart%' Or Owner1 LIKE '%ST AGNES%' Or Owner1 LIKE '%Lincoln Land Community%' Or "
+               "Owner1 LIKE '%U of IL At%' Or Owner1 LIKE '%Capital Area Career Center%' Or "
+               "Owner2 LIKE '%186%' Or Owner2 LIKE '%Sacred Heart%' Or Owner2 LIKE '%ST AGNES%' Or Owner2 LIKE '%Christ the King%' Or "
+               "Owner1 LIKE '%STATE OF ILLINOIS%' Or ClassCode IN ('50', '60')")
+
+# Owner table for each subject category and the test an owner row (Owner1, Owner2, MTGCode, ClassCode) must pass to be in it
+owner_categories = {
+    parcels_nehemiah_table: lambda owner1, owner2, mtg_code, class_code: nehemiah_owner1.search(owner1),
+    parcels_tsp_table: lambda owner1, owner2, mtg_code, class_code: tsp_owner1.search(owner1),
+    parcels_city_table: lambda owner1, owner2, mtg_code, class_code: mtg_code in (26, 66, 72, 73) or owner1.upper() == "SANGAMON COUNTY TRUSTEE",
+    parcels_owner_medical_table: lambda owner1, owner2, mtg_code, class_code: medical_owner1.search(owner1) or medical_owner2.search(owner2),
+    parcels_owner_schools_table: lambda owner1, owner2, mtg_code, class_code: schools_owner1.search(owner1) or schools_owner2.search(owner2),
+    parcels_owner_state_table: lambda owner1, owner2, mtg_code, class_code: owner1.upper() == "STATE OF ILLINOIS" and state_owner2.search(owner2),
+    parcels_commercial_table: lambda owner1, owner2, mtg_code, class_code: class_code in ("50", "60"),
+}
+
+# AddField types for the field types ListFields reports, any type not listed here is passed through upper-cased
+field_types = {"String": "TEXT", "SmallInteger": "SHORT", "Integer": "LONG", "BigInteger": "BIGINTEGER", "Single": "FLOAT", "Double": "DOUBLE",
+               "Date": "DATE", "DateOnly": "DATEONLY", "TimeOnly": "TIMEONLY", "TimestampOffset": "TIMESTAMPOFFSET", "Guid": "GUID",
+               "GlobalID": "GUID", "Blob": "BLOB", "Raster": "RASTER"}
+
+# Source feature class of each feature layer already made in this process, keyed by layer name
+layers = {}
+
+# Geodatabase this process writes stage outputs to, run_stage points it at the stage's own geodatabase in a worker
+stage_workspace = parcel_derivatives
+
+# List of on-disk features to clean up, the staging workspace is cleared by each worker
+to_delete = list(owner_categories) + [parcels_cache]
+
+
+def field_map_entry(name, field_type, length, precision, scale, source):
+    """Builds one field map entry of a field mapping string, keeping the whole field from source"""
+    flags = "false false false" if field_type == "GlobalID" else "true true false"
+    start, end = (0, length) if field_type == "Text" else (-1, -1)
+    return f"{name} '{name}' {flags} {length} {field_type} {precision} {scale},First,#,{source},{name},{start},{end}"
+
+
+# Permit and qualified census tract fields kept by the first permits spatial join as (name, type, length, precision, scale)
+permit_fields = [("CA_OBJECT_ID", "Double", 8, 0, 0), ("CaseNumber", "Text", 20, 0, 0), ("TypeDescription", "Text", 40, 0, 0),
+                 ("SubTypeDescription", "Text", 40, 0, 0), ("Status", "Text", 10, 0, 0), ("LOCATION", "Text", 100, 0, 0),
+                 ("NAME", "Text", 60, 0, 0), ("ROLE_DESC", "Text", 40, 0, 0), ("TASK_COMPLETE_DATE", "Date", 8, 0, 0),
+                 ("BusinessOwner", "Text", 60, 0, 0), ("SUM_PAYMENT_AMOUNT", "Double", 8, 0, 0), ("ASSET_ID_Parcel", "Text", 50, 0, 0)]
+qualified_census_tract_fields = [("OBJECTID", "Long", 4, 0, 10), ("STATEFP10", "Text", 2, 0, 0), ("COUNTYFP10", "Text", 3, 0, 0),
+                                 ("TRACTCE10", "Text", 6, 0, 0), ("GEOID10", "Text", 11, 0, 0), ("NAME10", "Text", 7, 0, 0),
+                                 ("NAMELSAD10", "Text", 20, 0, 0), ("MTFCC10", "Text", 5, 0, 0), ("FUNCSTAT10", "Text", 1, 0, 0),
+                                 ("ALAND10", "Double", 8, 8, 38), ("AWATER10", "Double", 8, 8, 38), ("INTPTLAT10", "Text", 11, 0, 0),
+                                 ("INTPTLON10", "Text", 12, 0, 0), ("CT_2010", "Double", 8, 8, 38), ("Inspector", "Text", 30, 0, 0),
+                                 ("InspUserNa", "Text", 18, 0, 0), ("SID", "Double", 8, 8, 38), ("GlobalID", "Text", 38, 0, 0),
+                                 ("Shape_STAr", "Double", 8, 8, 38), ("Shape_STLe", "Double", 8, 8, 38), ("GlobalID_1", "GlobalID", 38, 0, 0),
+                                 ("VALUE", "Text", 255, 0, 0)]
+permits_ctq_field_mapping = ";".join([field_map_entry(*field, "Permits_Issued") for field in permit_fields] +
+                                     [field_map_entry(*field, qualified_census_tracts) for field in qualified_census_tract_fields])
+
+
+@contextmanager
+def log_stage(name):
+    """Logs the start of a step and one finish line with how long it took"""
+    Logging.logger.info(f"------START {name}")
+    start = time.perf_counter()
+    yield
+    Logging.logger.info(f"------FINISH {name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def stage_gdb(stage_name):
+    """Returns the geodatabase a stage writes its outputs to before they are copied into the parcel derivatives geodatabase"""
+    return os.path.join(data, f"ParcelDerivatives_{stage_name}.gdb")
+
+
+def stage_output(feature_class):
+    """Returns where the running stage writes feature_class, keeping its name"""
+    return os.path.join(stage_workspace, os.path.basename(feature_class))
+
+
+def ensure_layer(feature_class, name):
+    """Makes the feature layer the first time it is asked for and reuses it afterwards, remaking it if the name was used for another source"""
+    if layers.get(name) != feature_class:
+        arcpy.MakeFeatureLayer_management(feature_class, name)
+        layers[name] = feature_class
+    return name
+
+
+def points_extent(points):
+    """Returns the extent of the points' own coordinates, or MAXOF when there is no area to narrow to (no points or a single point)"""
+    with arcpy.da.SearchCursor(points, ["SHAPE@XY"]) as cursor:
+        coordinates = [xy for xy, in cursor if xy[0] is not None]
+    if not coordinates:
+        return "MAXOF"
+    xs, ys = zip(*coordinates)
+    if min(xs) == max(xs) or min(ys) == max(ys):
+        return "MAXOF"
+    return arcpy.Extent(min(xs), min(ys), max(xs), max(ys))
+
+
+def parcels_under_points(points, out_feature_class):
+    """Joins the points onto the cached parcels they fall on, reading only the parcels inside the points' bounding box"""
+    with arcpy.EnvManager(extent=points_extent(points)):
+        arcpy.SpatialJoin_analysis(parcels_cache, points, out_feature_class, "JOIN_ONE_TO_ONE", "KEEP_COMMON")
+
+
+def parcels_by_pin_filter(owner_table, out_feature_class):
+    """Copies only the parcels whose PINs are in the owner table to out_feature_class, along with the owner attributes"""
+    # Read the owner rows once, keeping the first row for each PIN like a table join would
+    owner_table_fields = [field for field in arcpy.ListFields(owner_table) if field.type != "OID"]
+    owner_names = [field.name for field in owner_table_fields]
+    pin_index = owner_names.index("PIN1")
+    owners = {}
+    with arcpy.da.SearchCursor(owner_table, owner_names) as cursor:
+        for row in cursor:
+            if row[pin_index]:
+                owners.setdefault(row[pin_index], row)
+
+    # Filter the parcels by PIN in chunks small enough for the IN clause instead of joining the whole parcel layer
+    pins = sorted(owners)
+    wheres = ["PIN IN (" + ",".join(f"'{pin}'" for pin in pins[i:i + 900]) + ")" for i in range(0, len(pins), 900)] or ["1 = 0"]
+    arcpy.Select_analysis(parcels_cache, out_feature_class, wheres[0])
+    for where in wheres[1:]:
+        arcpy.MakeFeatureLayer_management(parcels_cache, "PIN_Chunk", where)
+        arcpy.Append_management("PIN_Chunk", out_feature_class, "NO_TEST")
+        arcpy.Delete_management("PIN_Chunk")
+
+    # Carry every owner field over to the filtered parcels from the PIN lookup instead of a table join, adding them in one call and
+    # numbering names already in use the way JoinField does
+    used_names = {field.name.upper() for field in arcpy.ListFields(out_feature_class)}
+    out_names, new_fields = [], []
+    for field in owner_table_fields:
+        name, suffix = field.name, 0
+        while name.upper() in used_names:
+            suffix += 1
+            name = f"{field.name}_{suffix}"
+        used_names.add(name.upper())
+        out_names.append(name)
+        new_fields.append([name, field_types.get(field.type, field.type.upper()), field.aliasName, field.length if field.type == "String" else ""])
+    arcpy.AddFields_management(out_feature_class, new_fields)
+
+    # Parcels whose PIN has no exact owner match keep empty owner fields, as they would through a join
+    with arcpy.da.UpdateCursor(out_feature_class, ["PIN"] + out_names) as cursor:
+        for row in cursor:
+            owner = owners.get(row[0])
+            if owner:
+                cursor.updateRow([row[0]] + list(owner))
+    return out_feature_class
+
+
+def worker_insert(name, level):
+    """Stands in for Logging.insert in worker processes, logging when the decorated stage starts and finishes"""
+    # An approximation of the shared Logging.insert messages, the level argument is accepted for the same signature but not reproduced
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            Logging.logger.info(f"{name} Started")
+            result = function(*args, **kwargs)
+            Logging.logger.info(f"{name} Finished")
+            return result
+        return wrapper
+    return decorator
+
+
+# Workers log through a queue that the main process writes to the log, see start_worker. Bound before the stages so their decorators resolve
+if __name__ == "__mp_main__":
+    Logging = types.SimpleNamespace(logger=logging.getLogger("ParcelDerivatives"), insert=worker_insert)
+
+
+def start_worker(log_queue):
+    """Sends a worker process's log records to the main process through log_queue"""
+    Logging.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    Logging.logger.setLevel(logging.INFO)
+
+
+def run_stage(stage_name):
+    """Runs one independent stage in a worker process, looked up by name so it pickles cleanly"""
+    global stage_workspace
+    arcpy.env.overwriteOutput = True
+
+    # Write the stage outputs to a geodatabase of its own so no two processes write to the same file geodatabase
+    stage_workspace = stage_gdb(stage_name)
+    if arcpy.Exists(stage_workspace):
+        arcpy.Delete_management(stage_workspace)
+    arcpy.CreateFileGDB_management(data, os.path.basename(stage_workspace))
+    try:
+        independent_stages[stage_name]()
+    except arcpy.ExecuteError:
+        # The main process only sees its own geoprocessing messages, so send this worker's with the error
+        raise arcpy.ExecuteError(arcpy.GetMessages(2))
+    finally:
+        arcpy.Delete_management(staging)
+
+
+def remove_stage_gdbs():
+    """Deletes whatever stage geodatabases are left in data"""
+    for stage_name in independent_stages:
+        if arcpy.Exists(stage_gdb(stage_name)):
+            arcpy.Delete_management(stage_gdb(stage_name))
+
+
+@Logging.insert("Owner Tables", 1)
+def owner_tables():
+    """Reads the parcel owners once and writes the owner table for each subject category"""
+    # Carry every owner field into the owner tables, not just the ones the category tests read
+    fields = owner_fields + [field.name for field in arcpy.ListFields(parcel_owners) if field.type not in ("OID", "GlobalID")
+                             and field.name.upper() not in (owner_field.upper() for owner_field in owner_fields)]
+
+    buckets = {table: [] for table in owner_categories}
+    with arcpy.da.SearchCursor(parcel_owners, fields, owner_where) as cursor:
+        for row in cursor:
+            owner1, owner2, class_code = (row[1] or "").strip(), (row[2] or "").strip(), (row[4] or "").strip()
+            for table, in_category in owner_categories.items():
+                if in_category(owner1, owner2, row[3], class_code):
+                    buckets[table].append(row)
+
+    positions = {name.upper(): index for index, name in enumerate(fields)}
+    for table, rows in buckets.items():
+        if table == parcels_city_table:
+            # The City table keeps only the fields its field mapping wrote, tmppin stays empty when ptinfo1 has none to copy
+            arcpy.CreateTable_management(os.path.dirname(table), os.path.basename(table))
+            arcpy.AddFields_management(table, city_owner_fields)
+            table_fields = [field[0] for field in city_owner_fields]
+            rows = [[row[positions[name.upper()]] if name.upper() in positions else None for name in table_fields] for row in rows]
+        else:
+            arcpy.CreateTable_management(os.path.dirname(table), os.path.basename(table), parcel_owners)
+            table_fields = fields
+        with arcpy.da.InsertCursor(table, table_fields) as cursor:
+            for row in rows:
+                cursor.insertRow(row)
+
+
+@Logging.insert("Cache Parcels", 1)
+def cache_parcels():
+    """Copies the SDE parcel polygons to the geodatabase once so every stage reads them locally"""
+    arcpy.FeatureClassToFeatureClass_conversion(parcel_polygons, parcel_derivatives, "ParcelPolygons_Cache")
+
+    # Index PIN so the PIN filters read only the matching parcels
+    arcpy.AddIndex_management(parcels_cache, "PIN", "PIN_Index")
 
 
 @Logging.insert("Permits to Parcels", 1)
@@ -102,200 +373,129 @@ def permits_parcels():
     """Combine different parcels marked with different types of permits into one feature class"""
 
     # Census Tracts
-    Logging.logger.info("------START Permits Issued")
-    arcpy.MakeQueryLayer_management(cityworks_view, "Query_PermitsIssued",
-                                    "select Shape,ObjectID,CA_OBJECT_ID,CaseNumber,TypeDescription,SubTypeDescription,Status,"
-                                    "LOCATION,NAME,ROLE_DESC,TASK_COMPLETE_DATE,BusinessOwner,SUM_PAYMENT_AMOUNT,ASSET_ID_Parcel,"
-                                    "VALUE from CityWorksView.dbo.vw_PLL_IssuedPermits", "ObjectID", "POINT", "3436",)
-    arcpy.FeatureClassToFeatureClass_conversion("Query_PermitsIssued", parcel_derivatives, "Permits_Issued")
-    arcpy.MakeFeatureLayer_management(permits_issued, "Permits_Issued")
-    arcpy.MakeFeatureLayer_management(qualified_census_tracts, "CensusTracts")
-    arcpy.SpatialJoin_analysis("Permits_Issued", "CensusTracts", permits_CTQ,
-                               field_mapping="CA_OBJECT_ID 'CA_OBJECT_ID' true true false 8 Double 0 0,First,#,Permits_Issued,CA_OBJECT_ID,-1,-1;"
-                                             f"CaseNumber 'CaseNumber' true true false 20 Text 0 0,First,#,Permits_Issued,CaseNumber,0,20;"
-                                             f"TypeDescription 'TypeDescription' true true false 40 Text 0 0,First,#,Permits_Issued,TypeDescription,0,40;"
-                                             f"SubTypeDescription 'SubTypeDescription' true true false 40 Text 0 0,First,#,Permits_Issued,SubTypeDescription,0,40;"
-                                             f"Status 'Status' true true false 10 Text 0 0,First,#,Permits_Issued,Status,0,10;"
-                                             f"LOCATION 'LOCATION' true true false 100 Text 0 0,First,#,Permits_Issued,LOCATION,0,100;"
-                                             f"NAME 'NAME' true true false 60 Text 0 0,First,#,Permits_Issued,NAME,0,60;"
-                                             f"ROLE_DESC 'ROLE_DESC' true true false 40 Text 0 0,First,#,Permits_Issued,ROLE_DESC,0,40;"
-                                             f"TASK_COMPLETE_DATE 'TASK_COMPLETE_DATE' true true false 8 Date 0 0,First,#,Permits_Issued,TASK_COMPLETE_DATE,-1,-1;"
-                                             f"BusinessOwner 'BusinessOwner' true true false 60 Text 0 0,First,#,Permits_Issued,BusinessOwner,0,60;"
-                                             f"SUM_PAYMENT_AMOUNT 'SUM_PAYMENT_AMOUNT' true true false 8 Double 0 0,First,#,Permits_Issued,SUM_PAYMENT_AMOUNT,-1,-1;"
-                                             f"ASSET_ID_Parcel 'ASSET_ID_Parcel' true true false 50 Text 0 0,First,#,Permits_Issued,ASSET_ID_Parcel,0,50;"
-                                             f"OBJECTID 'OBJECTID' true true false 4 Long 0 10,First,#,{qualified_census_tracts},OBJECTID,-1,-1;"
-                                             f"STATEFP10 'STATEFP10' true true false 2 Text 0 0,First,#,{qualified_census_tracts},STATEFP10,0,2;"
-                                             f"COUNTYFP10 'COUNTYFP10' true true false 3 Text 0 0,First,#,{qualified_census_tracts},COUNTYFP10,0,3;"
-                                             f"TRACTCE10 'TRACTCE10' true true false 6 Text 0 0,First,#,{qualified_census_tracts},TRACTCE10,0,6;"
-                                             f"GEOID10 'GEOID10' true true false 11 Text 0 0,First,#,{qualified_census_tracts},GEOID10,0,11;"
-                                             f"NAME10 'NAME10' true true false 7 Text 0 0,First,#,{qualified_census_tracts},NAME10,0,7;"
-                                             f"NAMELSAD10 'NAMELSAD10' true true false 20 Text 0 0,First,#,{qualified_census_tracts},NAMELSAD10,0,20;"
-                                             f"MTFCC10 'MTFCC10' true true false 5 Text 0 0,First,#,{qualified_census_tracts},MTFCC10,0,5;"
-                                             f"FUNCSTAT10 'FUNCSTAT10' true true false 1 Text 0 0,First,#,{qualified_census_tracts},FUNCSTAT10,0,1;"
-                                             f"ALAND10 'ALAND10' true true false 8 Double 8 38,First,#,{qualified_census_tracts},ALAND10,-1,-1;"
-                                             f"AWATER10 'AWATER10' true true false 8 Double 8 38,First,#,{qualified_census_tracts},AWATER10,-1,-1;"
-                                             f"INTPTLAT10 'INTPTLAT10' true true false 11 Text 0 0,First,#,{qualified_census_tracts},INTPTLAT10,0,11;"
-                                             f"INTPTLON10 'INTPTLON10' true true false 12 Text 0 0,First,#,{qualified_census_tracts},INTPTLON10,0,12;"
-                                             f"CT_2010 'CT_2010' true true false 8 Double 8 38,First,#,{qualified_census_tracts},CT_2010,-1,-1;"
-                                             f"Inspector 'Inspector' true true false 30 Text 0 0,First,#,{qualified_census_tracts},Inspector,0,30;"
-                                             f"InspUserNa 'InspUserNa' true true false 18 Text 0 0,First,#,{qualified_census_tracts},InspUserNa,0,18;"
-                                             f"SID 'SID' true true false 8 Double 8 38,First,#,{qualified_census_tracts},SID,-1,-1;"
-                                             f"GlobalID 'GlobalID' true true false 38 Text 0 0,First,#,{qualified_census_tracts},GlobalID,0,38;"
-                                             f"Shape_STAr 'Shape_STAr' true true false 8 Double 8 38,First,#,{qualified_census_tracts},Shape_STAr,-1,-1;"
-                                             f"Shape_STLe 'Shape_STLe' true true false 8 Double 8 38,First,#,{qualified_census_tracts},Shape_STLe,-1,-1;"
-                                             f"GlobalID_1 'GlobalID_1' false false false 38 GlobalID 0 0,First,#,{qualified_census_tracts},GlobalID_1,-1,-1;"
-                                             f"VALUE 'VALUE' true true false 255 Text 0 0,First,#,{qualified_census_tracts},VALUE,-1,-1")
-    Logging.logger.info("------FINISH Permits Issued")
-
-    # Surplus Properties
-    Logging.logger.info("------START Surplus Properties")
-    arcpy.MakeQueryLayer_management(cityworks_view, "Query_SurplusProperty",
-                                    "select CA_OBJECT_ID,CASE_TYPE,CASE_TYPE_DESC,CASE_NUMBER,CASE_STATUS,LOCATION,STATUS_CODE,CX,CY,PIN,AdminArea,Owner,PropHouseNo,PropDir,PropStreet,PropCity,PropState,"
-                                    "PropZip,CensusTract,Sub_Name,Doc_Number,MAPOrdinance,Name,TIFDISTNAME,Objectid,Shape,Ordinance,Assessee,CertNum,INSP,TaxYear,DocNo,SurUse "
-                                    "from CityWorksView.dbo.vw_PLL_SurplusProperty", "ObjectID", "POINT", "3436",)
-    arcpy.FeatureClassToFeatureClass_conversion("Query_SurplusProperty", parcel_derivatives, "Points_SurplusProperty", "CASE_STATUS IN ('SUR-ACTIVE', 'SUR-PEND')")
-    arcpy.MakeFeatureLayer_management(points_surplus_property, "Points_SurplusProperty")
-    arcpy.FeatureClassToFeatureClass_conversion(parcel_polygons, parcel_derivatives, "ParcelPolygons")
-    arcpy.MakeFeatureLayer_management(parcels, "ParcelPolygons")
-    arcpy.SpatialJoin_analysis("ParcelPolygons", "Points_SurplusProperty", parcels_surplus_property, "JOIN_ONE_TO_ONE", "KEEP_COMMON")
-    Logging.logger.info("------FINISH Surplus Properties")
+    with log_stage("Permits Issued"):
+        arcpy.MakeQueryLayer_management(cityworks_view, "Query_PermitsIssued",
+                                        "select Shape,ObjectID,CA_OBJECT_ID,CaseNumber,TypeDescription,SubTypeDescription,Status,"
+                                        "LOCATION,NAME,ROLE_DESC,TASK_COMPLETE_DATE,BusinessOwner,SUM_PAYMENT_AMOUNT,ASSET_ID_Parcel,"
+                                        "VALUE from CityWorksView.dbo.vw_PLL_IssuedPermits", "ObjectID", "POINT", "3436",)
+        arcpy.FeatureClassToFeatureClass_conversion("Query_PermitsIssued", stage_workspace, "Permits_Issued")
+        ensure_layer(stage_output(permits_issued), "Permits_Issued")
+        ensure_layer(qualified_census_tracts, "CensusTracts")
+        arcpy.SpatialJoin_analysis("Permits_Issued", "CensusTracts", permits_CTQ, field_mapping=permits_ctq_field_mapping)
 
     # Enterprise Zone
-    Logging.logger.info("------START Enterprise Zone")
-    arcpy.MakeFeatureLayer_management(permits_CTQ, "Permits_CTQ")
-    arcpy.MakeFeatureLayer_management(enterprise_zone, "EnterpriseZone")
-    arcpy.SpatialJoin_analysis("Permits_CTQ", "EnterpriseZone", permits_EZ)
-    Logging.logger.info("------FINISH Enterprise Zone")
+    with log_stage("Enterprise Zone"):
+        ensure_layer(enterprise_zone, "EnterpriseZone")
+        arcpy.SpatialJoin_analysis(permits_CTQ, "EnterpriseZone", permits_EZ)
 
     # TIF Districts
-    Logging.logger.info("------START TIF Districts")
-    arcpy.MakeFeatureLayer_management(permits_EZ, "permits_EZ")
-    arcpy.MakeFeatureLayer_management(tif_districts, "TIFDistricts")
-    arcpy.SpatialJoin_analysis("permits_EZ", "TIFDistricts", permits_TIF)
-    Logging.logger.info("------FINISH TIF Districts")
+    with log_stage("TIF Districts"):
+        ensure_layer(tif_districts, "TIFDistricts")
+        arcpy.SpatialJoin_analysis(permits_EZ, "TIFDistricts", permits_TIF)
 
     # Administrative Areas Merged
-    Logging.logger.info("------START Administrative Areas Merged")
-    arcpy.MakeFeatureLayer_management(permits_TIF, "permits_TIF")
-    arcpy.MakeFeatureLayer_management(admin_area_merged, "AdministrativeAreaMerged")
-    arcpy.SpatialJoin_analysis("permits_TIF", "AdministrativeAreaMerged", permits_Wards)
-    Logging.logger.info("------FINISH Administrative Areas Merged")
+    with log_stage("Administrative Areas Merged"):
+        ensure_layer(admin_area_merged, "AdministrativeAreaMerged")
+        arcpy.SpatialJoin_analysis(permits_TIF, "AdministrativeAreaMerged", permits_Wards)
 
     # Census Tracts
-    Logging.logger.info("------START Census Tracts")
-    arcpy.MakeFeatureLayer_management(permits_Wards, "permits_Wards")
-    arcpy.MakeFeatureLayer_management(census_tracts, "CensusTracts")
-    arcpy.SpatialJoin_analysis("permits_Wards", "CensusTracts", permits_opportunity_zones)
-    Logging.logger.info("------FINISH Census Tracts")
+    with log_stage("Census Tracts"):
+        ensure_layer(census_tracts, "CensusTracts2010")
+        arcpy.SpatialJoin_analysis(permits_Wards, "CensusTracts2010", stage_output(permits_opportunity_zones))
 
-    # Select parcels by location
-    selected_parcels = arcpy.SelectLayerByLocation_management("ParcelPolygons", "INTERSECT", permits_issued)
+    # Combine the permits and parcel polygons, reading only the parcels inside the permits bounding box and keeping those with a permit
+    with log_stage("Opportunity Zones"):
+        ensure_layer(stage_output(permits_opportunity_zones), "Permits_OpportunityZones")
+        with arcpy.EnvManager(extent=points_extent("Permits_OpportunityZones")):
+            arcpy.SpatialJoin_analysis(ensure_layer(parcels_cache, "ParcelPolygons"), "Permits_OpportunityZones", stage_output(parcels_permits_issued),
+                                       "JOIN_ONE_TO_MANY", "KEEP_COMMON")
 
-    # Combine the permits and parcel polygons
-    Logging.logger.info("------START Opportunity Zones")
-    arcpy.MakeFeatureLayer_management(permits_opportunity_zones, "Permits_OpportunityZones")
-    arcpy.SpatialJoin_analysis(selected_parcels, "Permits_OpportunityZones", parcels_permits_issued, "JOIN_ONE_TO_MANY")
-    Logging.logger.info("------FINISH Opportunity Zones")
+
+@Logging.insert("Surplus Parcels", 1)
+def surplus_parcels():
+    """Grabs the parcels under active and pending surplus property cases"""
+    arcpy.MakeQueryLayer_management(cityworks_view, "Query_SurplusProperty",
+                                    "select CA_OBJECT_ID,CASE_TYPE,CASE_TYPE_DESC,CASE_NUMBER,CASE_STATUS,LOCATION,STATUS_CODE,CX,CY,PIN,AdminArea,Owner,PropHouseNo,PropDir,PropStreet,PropCity,PropState,"
+                                    "PropZip,CensusTract,Sub_Name,Doc_Number,MAPOrdinance,Name,TIFDISTNAME,Objectid,Shape,Ordinance,Assessee,CertNum,INSP,TaxYear,DocNo,SurUse "
+                                    "from CityWorksView.dbo.vw_PLL_SurplusProperty where CASE_STATUS IN ('SUR-ACTIVE', 'SUR-PEND')", "ObjectID", "POINT", "3436",)
+    arcpy.FeatureClassToFeatureClass_conversion("Query_SurplusProperty", stage_workspace, "Points_SurplusProperty")
+    ensure_layer(stage_output(points_surplus_property), "Points_SurplusProperty")
+    parcels_under_points("Points_SurplusProperty", stage_output(parcels_surplus_property))
 
 
 @Logging.insert("Nehemiah Parcels", 1)
 def nehemiah_parcels():
     """Extracts parcels with an owner name containing Nehemiah"""
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_Nehemiah_table",
-                                  r"Owner1 LIKE '%NEHEMIAH AFFORDABLE HOUSING II%' Or "
-                                  r"Owner1 LIKE '%NEHEMIAH AFFORDABLE HOUSING LP%' Or "
-                                  r"Owner1 LIKE '%NEHEMIAH EXPANSION%' Or "
-                                  r"Owner1 LIKE '%NEHEMIAH PSJ LP%'")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_nehemiah_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_Nehemiah")
+    parcels_by_pin_filter(parcels_nehemiah_table, stage_output(parcels_nehemiah))
 
 
 @Logging.insert("TSP Parcels", 1)
 def tsp_parcels():
     """Extracts parcels with an owner name containing TSP (The Springfield Project)"""
 
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_TSP_table", r"Owner1 LIKE '%TSP%'")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_tsp_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_TSP")
+    parcels_by_pin_filter(parcels_tsp_table, stage_output(parcels_tsp))
 
 
 @Logging.insert("City Parcels", 1)
 def city_parcels():
     """Extracts parcels owned by the City of Springfield then splits into new feature classes by owner organization"""
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_City_table", "MTGCode = 26 Or MTGCODE =66 Or MTGCode = 72 Or MTGCode = 73 Or Owner1 = 'SANGAMON COUNTY TRUSTEE'",
-                                  fr"tmppin 'tmppin' true false false 8 Double 0 11,First,#,{parcel_owners},-1,-1;"
-                                  fr"Owner1 'Owner1' true false false 30 Text 0 0,First,#,{parcel_owners},Owner1,0,30;"
-                                  fr"MTGCode 'MTGCode' true true false 2 Short 0 5,First,#,{parcel_owners},MTGCode,-1,-1;"
-                                  fr"PIN1 'PIN1' true true false 11 Text 0 0,First,#,{parcel_owners},PIN1,0,11")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_city_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_City")
-    arcpy.Select_analysis(parcels_owner_city, parcels_cwlp, "SubjectParcels.MTGCode = 26 Or SubjectParcels.MTGCode = 66")
-    arcpy.Select_analysis(parcels_owner_city, parcels_cospw, "SubjectParcels.MTGCode = 72")
-    arcpy.Select_analysis(parcels_owner_city, parcels_oped, "SubjectParcels.MTGCode = 73")
-    arcpy.Select_analysis(parcels_owner_city, parcels_trustee, "SubjectParcels.Owner1 = 'SANGAMON COUNTY TRUSTEE'")
+    parcels_by_pin_filter(parcels_city_table, parcels_owner_city)
+
+    # Split the city parcels by owner organization in a single pass
+    fields = ["SHAPE@"] + [field.name for field in arcpy.ListFields(parcels_owner_city) if field.editable and field.type != "Geometry"]
+    mtg_code_index, owner_index = fields.index("MTGCode"), fields.index("Owner1")
+    for feature_class in (parcels_cwlp, parcels_cospw, parcels_oped, parcels_trustee):
+        arcpy.CreateFeatureclass_management(stage_workspace, os.path.basename(feature_class), "POLYGON", parcels_owner_city,
+                                            "SAME_AS_TEMPLATE", "SAME_AS_TEMPLATE", parcels_owner_city)
+    with arcpy.da.SearchCursor(parcels_owner_city, fields) as city_cursor, \
+            arcpy.da.InsertCursor(stage_output(parcels_cwlp), fields) as cwlp_cursor, \
+            arcpy.da.InsertCursor(stage_output(parcels_cospw), fields) as cospw_cursor, \
+            arcpy.da.InsertCursor(stage_output(parcels_oped), fields) as oped_cursor, \
+            arcpy.da.InsertCursor(stage_output(parcels_trustee), fields) as trustee_cursor:
+        mtg_code_cursors = {26: cwlp_cursor, 66: cwlp_cursor, 72: cospw_cursor, 73: oped_cursor}
+        for row in city_cursor:
+            if row[mtg_code_index] in mtg_code_cursors:
+                mtg_code_cursors[row[mtg_code_index]].insertRow(row)
+            if (row[owner_index] or "").strip().upper() == "SANGAMON COUNTY TRUSTEE":
+                trustee_cursor.insertRow(row)
 
 
 @Logging.insert("Other Parcels", 1)
 def other_parcels():
     """Creates parcels for special types of owners like hospitals, schools, and State owned parcels"""
     # Medical
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_Medical_table",
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%MEMORIAL HEALTH SYSTEM%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%SIU SCHOOL OF MEDICIN%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%ST JOHNS%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%SPRINGFIELD CLINIC%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%Springfield Hospital%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%MCFARLAND MENTAL HEALTH%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%Public Health Facility%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%Central Counties Health%'")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_owner_medical_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_Medical")
+    parcels_by_pin_filter(parcels_owner_medical_table, stage_output(parcels_owner_medical))
 
     # Schools
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_Schools_table",
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%186%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%186%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%Sacred Heart%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%Sacred Heart%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%ST AGNES%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%ST AGNES%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%Christ the King%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%Lincoln Land Community%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%U of IL At%' Or "
-                                  "soa.SANGIS.ptinfo1.Owner1 LIKE '%Capital Area Career Center%'")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_owner_schools_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_Schools")
+    parcels_by_pin_filter(parcels_owner_schools_table, stage_output(parcels_owner_schools))
 
     # State of Illinois
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_State_Table",
-                                  "soa.SANGIS.ptinfo1.Owner1 = 'STATE OF ILLINOIS' And "
-                                  "soa.SANGIS.ptinfo1.Owner2 LIKE '%SECRETARY%'")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_owner_state_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_State")
+    parcels_by_pin_filter(parcels_owner_state_table, stage_output(parcels_owner_state))
 
     # Commercial
-    arcpy.TableToTable_conversion(parcel_owners, parcel_derivatives, "Parcels_Commercial_table", "soa.SANGIS.ptinfo1.ClassCode IN ('50', '60')")
-    joined_tables = arcpy.AddJoin_management(parcel_polygons, "PIN", parcels_commercial_table, "PIN1", "KEEP_COMMON")
-    arcpy.FeatureClassToFeatureClass_conversion(joined_tables, parcel_derivatives, "Parcels_Commercial")
+    parcels_by_pin_filter(parcels_commercial_table, stage_output(parcels_commercial))
 
 
 @Logging.insert("POI Parcels", 1)
 def poi_parcels():
     """Takes the facility site points layer and grabs the parcels they fall on as a separate layer"""
-    arcpy.SpatialJoin_analysis(parcel_polygons, facility_site_point, parcels_poi, "JOIN_ONE_TO_ONE", "KEEP_COMMON")
+    parcels_under_points(facility_site_point, stage_output(parcels_poi))
 
 
 @Logging.insert("Mowing Parcels", 1)
 def mowing_parcels():
     """Combines all the relevant parcels into one feature class showing plots the City mows"""
-    arcpy.FeatureClassToFeatureClass_conversion(row, parcel_derivatives, "MowZones")
+    arcpy.CopyFeatures_management(row, mow_zones)
 
-    """# Append county trustee parcels
-    selected_city_parcels = arcpy.SelectLayerByLocation_management(parcels_trustee, "HAVE_THEIR_CENTER_IN", city_limits)
+    """# City limits layer shared by both centroid selections
+    limits = ensure_layer(city_limits, "CityLimits")
+
+    # Append county trustee parcels
+    selected_city_parcels = arcpy.SelectLayerByLocation_management(parcels_trustee, "HAVE_THEIR_CENTER_IN", limits)
     arcpy.Append_management(selected_city_parcels, mow_zones, "NO_TEST",
                             fr"ItemNo 'ItemNo' true true false 2 Short 0 0,First,#;"
                             fr"Use_ 'Use_' true true false 50 Text 0 0,First,#;"
-                            fr"Description 'Desc' true true false 50 Text 0 0,First,#,{parcels_trustee},Owner1,0,30"
+                            fr"Description 'Desc' true true false 50 Text 0 0,First,#,{parcels_trustee},Owner1,0,30;"
                             fr"DateAdded 'DateAdded' true true false 8 Date 0 0,First,#;"
                             fr"Misc 'Misc' true true false 50 Text 0 0,First,#;"
                             fr"MowedBy 'MowedBy' true true false 50 Text 0 0,First,#;"
@@ -306,41 +506,68 @@ def mowing_parcels():
                             fr"Nbr2 'nbr2' true true false 8 Double 0 0,First,#;"
                             fr"Test1 'Test1' true true false 15 Text 0 0,First,#;"
                             fr"Test2 'Test2' true true false 25 Text 0 0,First,#;"
-                            fr"FacilityID 'Facility Identifier' true true false 50 Text 0 0,First,#,P{parcels_trustee}e,PIN,0,255;"
+                            fr"FacilityID 'Facility Identifier' true true false 50 Text 0 0,First,#,{parcels_trustee},PIN,0,255;"
                             fr"NAD83X 'Easting(X)' true true false 8 Double 0 0,First,#;"
                             fr"NAD83Y 'Northing(Y)' true true false 8 Double 0 0,First,#;"
                             fr"Status 'Status' true true false 50 Text 0 0,First,#;"
                             fr"Lbl 'Lbl' true true false 50 Text 0 0,First,#")
 
     # Append surplus property parcels
-    selected_surplus_property_parcels = arcpy.SelectLayerByLocation_management(parcels_surplus_property, "HAVE_THEIR_CENTER_IN", city_limits)
+    selected_surplus_property_parcels = arcpy.SelectLayerByLocation_management(parcels_surplus_property, "HAVE_THEIR_CENTER_IN", limits)
     arcpy.Append_management(selected_surplus_property_parcels, mow_zones, "NO_TEST")"""
 
-    # Calculate fields
-    arcpy.CalculateField_management(mow_zones, "MowedBy", "'PW'")
-    """selected_county_trustee_parcels = arcpy.SelectLayerByAttribute_management(mow_zones, "NEW_SELECTION", "Description LIKE '%SANGAMON COUNTY TRUSTEE%'")
-    arcpy.CalculateFields_management(selected_county_trustee_parcels, "PYTHON3", [["Use_", "'PARCEL'"], ["MowedBy", "'CONT'"]])
-    selected_surplus_property_parcels = arcpy.SelectLayerByAttribute_management(mow_zones, "NEW_SELECTION", "Use_ LIKE '%Vacant Lot%'")
-    arcpy.CalculateFields_management(selected_surplus_property_parcels, "PYTHON3", [["Description", "'Vacant Lot'"], ["MowedBy", "'CONT'"]])"""
+    # Calculate fields in a single cursor pass
+    with arcpy.da.UpdateCursor(mow_zones, ["MowedBy"]) as cursor:
+        for _ in cursor:
+            cursor.updateRow(["PW"])
+    """with arcpy.da.UpdateCursor(mow_zones, ["Description", "Use_", "MowedBy"]) as cursor:
+        for description, use, mowed_by in cursor:
+            if description and "SANGAMON COUNTY TRUSTEE" in description:
+                use, mowed_by = "PARCEL", "CONT"
+            elif use and "Vacant Lot" in use:
+                description, mowed_by = "Vacant Lot", "CONT"
+            cursor.updateRow([description, use, mowed_by])"""
 
 
 @Logging.insert("Cleanup", 1)
 def cleanup():
     """Cleanup data that is no longer needed"""
-    for feature_class in to_delete:
-        arcpy.Delete_management(feature_class)
+    arcpy.Delete_management(to_delete)
+
+
+# Stages with no dependencies on each other, run in parallel before mowing and cleanup
+independent_stages = {"permits_parcels": permits_parcels, "surplus_parcels": surplus_parcels, "nehemiah_parcels": nehemiah_parcels,
+                      "tsp_parcels": tsp_parcels, "city_parcels": city_parcels, "other_parcels": other_parcels, "poi_parcels": poi_parcels}
+
+
+@Logging.insert("Merge Stage Outputs", 1)
+def merge_stage_outputs():
+    """Copies every stage's outputs into the parcel derivatives geodatabase from the main process"""
+    for stage_name in independent_stages:
+        with arcpy.EnvManager(workspace=stage_gdb(stage_name)):
+            datasets = arcpy.ListFeatureClasses() + arcpy.ListTables()
+        for dataset in datasets:
+            arcpy.Copy_management(os.path.join(stage_gdb(stage_name), dataset), os.path.join(parcel_derivatives, dataset))
 
 
 if __name__ == "__main__":
     traceback_info = traceback.format_exc()
     try:
         Logging.logger.info("Script Execution Started")
-        permits_parcels()
-        nehemiah_parcels()
-        tsp_parcels()
-        city_parcels()
-        other_parcels()
-        poi_parcels()
+        owner_tables()
+        cache_parcels()
+        # Write the workers' log records through the shared logger from this process, Logger.handle serves as the listener's handler
+        log_queue = multiprocessing.Queue()
+        log_listener = logging.handlers.QueueListener(log_queue, Logging.logger)
+        log_listener.start()
+        try:
+            with ProcessPoolExecutor(max_workers=4, initializer=start_worker, initargs=(log_queue,)) as executor:
+                list(executor.map(run_stage, independent_stages))
+            merge_stage_outputs()
+        finally:
+            # Remove the stage geodatabases whether the stages and merge finished or the run aborted part way
+            log_listener.stop()
+            remove_stage_gdbs()
         mowing_parcels()
         cleanup()
         Logging.logger.info("Script Execution Finished")
@@ -348,7 +575,8 @@ if __name__ == "__main__":
         Logging.logger.info(traceback_info)
     except NameError:
         print(traceback_info)
-    except arcpy.ExecuteError:
-        Logging.logger.error(arcpy.GetMessages(2))
+    except arcpy.ExecuteError as error:
+        # Worker failures carry their own tool messages, main process failures carry the same messages GetMessages(2) returns
+        Logging.logger.error(error)
     except:
         Logging.logger.info("An unspecified exception occurred")